@@ -8,13 +8,18 @@ setup(
     author="Josh Temple",
     url="https://github.com/fixdauto/tap-shipstation",
     classifiers=["Programming Language :: Python :: 3 :: Only"],
+    python_requires=">=3.9",
     packages=find_packages(),
     install_requires=[
         "singer-python>=5.2.0",
         "requests>=2.20.0",
         "pendulum>=2.0.5",
-        "jsonref>=0.2"
+        "jsonref>=0.2",
+        "orjson>=3.6.0"
     ],
+    extras_require={
+        "cache": ["requests-cache>=1.0"]
+    },
     entry_points="""
     [console_scripts]
     tap-shipstation=tap_shipstation:main
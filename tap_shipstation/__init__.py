@@ -5,7 +5,7 @@ The tap operates in two main modes: Discovery and Sync.
 
 Discovery Mode:
 - The `discover()` function builds a Singer Catalog by dynamically loading JSON schemas
-    from the `./schemas` directory.
+    from the `./schemas` directory. Dereferenced schemas are cached on disk between runs.
 - It enriches the catalog with default metadata, including `selected-by-default`
     and `table-key-properties` for streams like 'shipments' and 'orders'.
 
@@ -15,28 +15,87 @@ Sync Mode:
 - On the first run without a state file, it defaults to syncing data from the last 30 days.
 - To manage API rate limits and ensure predictable request sizes, data is fetched in
     daily windows.
-- For each selected stream, it iterates day-by-day from the start bookmark to the
-    present, paginating through API results.
+- Selected streams are synced at the same time, each on its own thread.
+- For each selected stream, it splits the range from the start bookmark to the
+    present into days and paginates through several days' API results concurrently
+    on a thread pool; records are still emitted day-by-day, in order.
 - Records are transformed against their JSON schema before being written to stdout
     as Singer messages.
-- The state (bookmark) is persisted after each successfully synced day.
+- The bookmark advances after each successfully synced day and is emitted every
+    `SHIPSTATION_STATE_EVERY_DAYS` days (default 7) and when the stream finishes.
 
 The main entry point, `main()`, parses command-line arguments to run either the
 discovery or sync process.
 """
 import os
-import json
+import sys
+import queue
+import functools
+import hashlib
+import tempfile
+import threading
 import jsonref
-from datetime import timedelta
+import orjson
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 import pendulum
 import singer
 from singer import utils, metadata
 from singer.catalog import Catalog
-from .client import ShipStationClient
+from .client import ShipStationClient, PREFETCH_PAGES
 
 # API v2: headers-based auth by default
 REQUIRED_CONFIG_KEYS = ['api_key']
 LOGGER = singer.get_logger()
+# ShipStation dates are in Pacific time
+TIMEZONE = ZoneInfo('America/Los_Angeles')
+BOOKMARK_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Records requested per page; fewer, larger pages mean fewer round-trips.
+# Override with SHIPSTATION_PAGE_SIZE; the client falls back to 100 if rejected.
+DEFAULT_PAGE_SIZE = 500
+# Default number of day-windows fetched from the API at the same time;
+# override with the SHIPSTATION_CONCURRENCY env var (1 fetches serially)
+WINDOW_CONCURRENCY = 8
+# Page-sized batches of records each in-flight day-window may hold before its
+# fetch thread waits for the writer, bounding memory to a few pages per window
+WINDOW_BUFFER_BATCHES = 2
+# Fully-dereferenced schemas are cached here between runs
+SCHEMA_CACHE_DIR = os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'tap-shipstation', 'refs')
+# Serializes stdout writes and state updates across concurrently synced streams
+_OUTPUT_LOCK = threading.Lock()
+# Streams offered by discovery; deprecated/legacy v1 streams like 'orders' are left out
+_SUPPORTED_STREAMS = frozenset({'shipments', 'fulfillments'})
+# Streams synced in created_at day-windows
+_DATE_FILTER_STREAMS = frozenset({'shipments', 'fulfillments'})
+# Put in a day-window's buffer once all of its records have been fetched
+_WINDOW_DONE = object()
+
+
+def _env_int(name, default):
+    # Positive integer setting from an env var. A malformed value (e.g. an empty
+    # string from a templated env) falls back to `default` with a warning
+    # instead of failing at import; values below 1 are raised to 1.
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        LOGGER.warning('Ignoring invalid %s=%r; using %s.', name, value, default)
+        return default
+
+
+# Env-var switches, read once at import rather than on every stream and window
+_TEST_ONE_DAY = os.getenv('SHIPSTATION_TEST_ONE_DAY', 'false').lower() == 'true'
+_DEBUG_SAMPLE = os.getenv('SHIPSTATION_DEBUG_SAMPLE', 'false').lower() == 'true'
+_BYPASS_TRANSFORM = os.getenv('SHIPSTATION_BYPASS_TRANSFORM', 'false').lower() == 'true'
+_CONCURRENCY = _env_int('SHIPSTATION_CONCURRENCY', WINDOW_CONCURRENCY)
+_PAGE_SIZE = _env_int('SHIPSTATION_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+_STATE_EVERY_DAYS = _env_int('SHIPSTATION_STATE_EVERY_DAYS', 7)
 
 
 def get_abs_path(path):
@@ -44,26 +103,64 @@ def get_abs_path(path):
     return os.path.join(os.path.dirname(os.path.realpath(__file__)), path)
 
 
-def load_schemas():
-    # Read v2-supported schema files and return a dict keyed by stream name.
-    # Explicitly filter out deprecated/legacy streams like 'orders'.
-    allowed_streams = {'shipments', 'fulfillments'}
-    schemas = {}
-    for filename in os.listdir(get_abs_path('schemas')):
-        file_raw = filename.replace('.json', '')
-        if file_raw not in allowed_streams:
-            continue
-        path = get_abs_path('schemas') + '/' + filename
-        with open(path) as file:
-            schemas[file_raw] = jsonref.load(file)
+SCHEMAS_DIR = get_abs_path('schemas')
+
+
+def load_schema_file(path):
+    # Load a schema with all $refs resolved. Files are parsed with orjson and
+    # handed to jsonref for ref resolution. The resolved schema is cached on
+    # disk keyed by the file's path, mtime and size, so warm starts only pay
+    # for a single orjson.loads; set TAP_SHIPSTATION_NO_CACHE=1 to bypass it.
+    if os.getenv('TAP_SHIPSTATION_NO_CACHE', '') == '1':
+        with open(path, 'rb') as file:
+            return jsonref.replace_refs(orjson.loads(file.read()))
+
+    # md5 only names the cache file, so it is allowed on FIPS-enforcing builds
+    key = hashlib.md5('{}:{}:{}'.format(
+        path, os.path.getmtime(path), os.path.getsize(path)).encode(), usedforsecurity=False).hexdigest()
+    cache_path = os.path.join(SCHEMA_CACHE_DIR, key + '.json')
+    try:
+        with open(cache_path, 'rb') as file:
+            return orjson.loads(file.read())
+    except (OSError, ValueError):
+        pass
+
+    with open(path, 'rb') as file:
+        schema = jsonref.replace_refs(orjson.loads(file.read()))
+    try:
+        os.makedirs(SCHEMA_CACHE_DIR, exist_ok=True)
+        # Write to a temp file first so concurrent runs never read a partial cache entry
+        with tempfile.NamedTemporaryFile('w', dir=SCHEMA_CACHE_DIR, delete=False) as file:
+            jsonref.dump(schema, file)
+        os.replace(file.name, cache_path)
+    except OSError as e:
+        LOGGER.debug('Could not write schema cache %s: %s', cache_path, e)
+    return schema
+
+
+def list_schema_names():
+    # Return the v2-supported stream names that have a schema file, without
+    # reading the files. Explicitly filter out deprecated/legacy streams like 'orders'.
+    names = []
+    with os.scandir(SCHEMAS_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.json'):
+                continue
+            file_raw = entry.name[:-len('.json')]
+            if file_raw in _SUPPORTED_STREAMS:
+                names.append(file_raw)
+
+    return names
 
-    return schemas
+
+@functools.lru_cache(maxsize=None)
+def load_schema(name):
+    # Load and dereference a single stream's schema the first time it is needed.
+    return load_schema_file(os.path.join(SCHEMAS_DIR, name + '.json'))
 
 
 def discover():
     # Build a Singer catalog from local schemas and default metadata.
-    raw_schemas = load_schemas()
-
     streams = []
 
     keys = {
@@ -71,7 +168,8 @@ def discover():
         'fulfillments': ['fulfillment_id']
     }
 
-    for schema_name, schema in raw_schemas.items():
+    for schema_name in list_schema_names():
+        schema = load_schema(schema_name)
         top_level_metadata = {
             'selected': True,
             'selected-by-default': True,
@@ -100,39 +198,192 @@ def discover():
 
 
 def get_selected_streams(catalog):
-    # Return list of stream ids where top-level metadata 'selected' is True.
-    selected_streams = []
+    # Return the set of stream ids where top-level metadata 'selected' is True.
+    selected_streams = set()
     for stream in catalog.streams:
         stream_metadata = metadata.to_map(stream.metadata)
         if metadata.get(stream_metadata, (), "selected"):
-            selected_streams.append(stream.tap_stream_id)
-
-    return selected_streams
-
-
-def sync(config, state, catalog):
-    # Core extraction loop:
-    # - Determine selected streams
-    # - For each selected stream, compute start/end window
-    # - Iterate day-by-day, paginate ShipStation API, transform, write records
-    # - Persist bookmark at the end of each day
-    if isinstance(catalog, dict):
-        catalog = Catalog.from_dict(catalog)
-    selected_stream_ids = get_selected_streams(catalog)
-
-    for stream in catalog.streams:
-        stream_id = stream.tap_stream_id
-        stream_schema = stream.schema
-        if stream_id not in selected_stream_ids:
-            continue
-
-        LOGGER.info("Beginning sync of stream '%s'.", stream_id)
+            selected_streams.add(stream.tap_stream_id)
+
+    return frozenset(selected_streams)
+
+
+def parse_bookmark(value):
+    # Parse a bookmark into an aware datetime; naive values are Pacific time.
+    # The tap writes 'YYYY-MM-DD HH:MM:SS', which the stdlib parses directly;
+    # anything else (e.g. legacy modifyDate values) falls back to pendulum.
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return pendulum.parse(value, tz='America/Los_Angeles')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=TIMEZONE)
+    return parsed
+
+
+def _write_record(stream_id, record):
+    # Serialize with orjson straight into stdout's byte buffer. singer.write_record()
+    # flushes stdout after every message; records are left to the buffer instead
+    # and go out with the next STATE message (singer.write_state flushes the text
+    # layer first, so ordering is kept) or when the stream finishes.
+    sys.stdout.buffer.write(orjson.dumps(
+        {'type': 'RECORD', 'stream': stream_id, 'record': record}) + b'\n')
+
+
+def _hand_over(buffer, item, stop):
+    # Put `item` in a day-window's buffer, waiting while the buffer is full.
+    # Returns False, without putting it, once the window has been abandoned.
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _fetch_window(client, stream_id, params, start_at, end_at, buffer, stop):
+    # Fetch every record of a single day-window. Runs on a worker thread and
+    # hands records to the writing thread through `buffer`, a bounded queue, in
+    # page-sized batches; once the buffer is full it waits for the writer to
+    # catch up. The window ends with _WINDOW_DONE, or with the exception that
+    # stopped the fetch. Gives up as soon as `stop` is set.
+    batch_size = params['page_size']
+    batch = []
+    try:
+        for record in client.paginate(stream_id, params):
+            # For fulfillments, enforce a strict client-side window filter to avoid history dumps
+            if stream_id == 'fulfillments':
+                ts_str = record.get('created_at') or record.get('ship_date') or record.get('delivered_at')
+                try:
+                    ts = pendulum.parse(ts_str) if ts_str else None
+                except Exception:
+                    ts = None
+                if (ts is None) or not (start_at <= ts < end_at):
+                    continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                if not _hand_over(buffer, batch, stop):
+                    return
+                batch = []
+        if batch and not _hand_over(buffer, batch, stop):
+            return
+    except Exception as e:
+        _hand_over(buffer, e, stop)
+        return
+    _hand_over(buffer, _WINDOW_DONE, stop)
+
+
+def _window_batches(buffer, stop):
+    # Yield a day-window's record batches as its fetch thread hands them over,
+    # re-raising the error that ended the fetch. Closing this generator early
+    # (e.g. when writing the window fails) tells the fetch thread to stop.
+    try:
+        while True:
+            item = buffer.get()
+            if item is _WINDOW_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def _fetch_windows(client, stream_id, windows, concurrency, page_size):
+    # Fetch day-windows on a thread pool, keeping at most `concurrency` windows
+    # in flight, and yield (bookmark, params, batches) in window order so that
+    # records and bookmarks are still emitted oldest day first. The oldest
+    # window's records stream straight through to the writer; the windows
+    # behind it buffer at most WINDOW_BUFFER_BATCHES batches each. Date strings
+    # are formatted once per window; windows are contiguous, so each start date
+    # is the previous window's end date.
+    in_flight = deque()
+    stops = []
+    end_date = None
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for start_at, end_at in windows:
+            start_date = end_date or start_at.strftime('%Y-%m-%d')
+            end_date = end_at.strftime('%Y-%m-%d')
+            # Shipments and Fulfillments: use created_at filters (v2 behavior)
+            params = {
+                'created_at_start': start_date,
+                'created_at_end': end_date,
+                'page': 1,
+                'page_size': page_size
+            }
+            buffer = queue.Queue(maxsize=WINDOW_BUFFER_BATCHES)
+            stop = threading.Event()
+            stops.append(stop)
+            executor.submit(_fetch_window, client, stream_id, params, start_at, end_at, buffer, stop)
+            in_flight.append((end_at.strftime(BOOKMARK_FORMAT), params, _window_batches(buffer, stop)))
+            if len(in_flight) >= concurrency:
+                yield in_flight.popleft()
+        while in_flight:
+            yield in_flight.popleft()
+    finally:
+        # Normally every window is done by now; if the caller stopped early,
+        # release fetch threads waiting on a full buffer and drop queued windows.
+        for stop in stops:
+            stop.set()
+        executor.shutdown(cancel_futures=True)
+
+
+def _write_window(stream_id, schema_dict, batches):
+    # Transform and write one day-window's records, batch by batch as they are
+    # fetched, and return how many were written. Only the writes themselves
+    # hold _OUTPUT_LOCK, so other streams are not held up while this one waits
+    # on the API.
+    count = 0
+    first_logged = False
+    first_transformed_logged = False
+    # One Transformer per window instead of one per record via singer.transform().
+    # Records are deeply nested (addresses, packages, items), so coercion stays
+    # row-wise; a columnar round trip would cost more than it saves.
+    with singer.Transformer() as transformer:
+        for records in batches:
+            if _DEBUG_SAMPLE and not first_logged:
+                try:
+                    LOGGER.info('Sample %s record keys (first item): %s', stream_id, sorted(list(records[0].keys())))
+                except Exception:
+                    LOGGER.info('Sample %s record available but failed to log keys.', stream_id)
+                first_logged = True
+
+            if not _BYPASS_TRANSFORM:
+                records = [transformer.transform(record, schema_dict) for record in records]
+                if _DEBUG_SAMPLE and not first_transformed_logged:
+                    try:
+                        LOGGER.info('Sample transformed %s record keys (first item): %s', stream_id, sorted(list(records[0].keys())))
+                    except Exception:
+                        LOGGER.info('Transformed sample available but failed to log keys for %s.', stream_id)
+                    first_transformed_logged = True
+
+            with _OUTPUT_LOCK:
+                for record in records:
+                    _write_record(stream_id, record)
+            count += len(records)
+    return count
+
+
+def sync_stream(client, stream, state):
+    # Sync one selected stream:
+    # - Compute its start/end window
+    # - Split it into days and fetch them concurrently from the ShipStation API
+    # - Transform and write records day-by-day, in order
+    # - Advance the bookmark after each day, emitting STATE every few days
+    # Streams run side by side, so every stdout write and state update
+    # happens under _OUTPUT_LOCK.
+    stream_id = stream.tap_stream_id
+    LOGGER.info("Beginning sync of stream '%s'.", stream_id)
+    # Materialize the schema once per stream rather than once per record
+    schema_dict = stream.schema.to_dict()
+    with _OUTPUT_LOCK:
         singer.write_schema(
             stream_id,
-            stream_schema.to_dict(),
+            schema_dict,
             stream.key_properties)
 
-        client = ShipStationClient(config)
         # Bookmark alignment: we filter by created_at_* params, so store bookmark under 'created_at'.
         # Backward compatibility: fall back to legacy 'modifyDate' bookmark if present.
         bookmark = singer.get_bookmark(
@@ -143,102 +394,97 @@ def sync(config, state, catalog):
                 tap_stream_id=stream_id,
                 key='modifyDate')
 
-        if bookmark:
-            start_at = pendulum.parse(bookmark, tz='America/Los_Angeles')
+    if bookmark:
+        start_at = parse_bookmark(bookmark)
+    else:
+        if stream_id == 'fulfillments':
+            start_at = datetime.now(TIMEZONE) - timedelta(days=7)
         else:
-            if stream_id == 'fulfillments':
-                start_at = pendulum.now('America/Los_Angeles').subtract(days=7)
-            else:
-                LOGGER.info("No bookmark found. Syncing last 30 days.")
-                start_at = pendulum.now('America/Los_Angeles').subtract(days=30)
-
-        stream_end_at = pendulum.now('America/Los_Angeles')
-        if os.getenv('SHIPSTATION_TEST_ONE_DAY', 'false').lower() == 'true':
-            test_end = start_at.add(days=1)
-            if test_end < stream_end_at:
-                stream_end_at = test_end
-            LOGGER.info('SHIPSTATION_TEST_ONE_DAY enabled; limiting stream_end_at to %s', stream_end_at)
-
-        end_at = start_at
-        while end_at < stream_end_at:
-            end_at = min(end_at.add(days=1), stream_end_at)
-
-            # Shipments and Fulfillments: use created_at filters (v2 behavior)
-            if stream_id == 'shipments':
-                params = {
-                    'created_at_start': start_at.strftime('%Y-%m-%d'),
-                    'created_at_end': end_at.strftime('%Y-%m-%d'),
-                    'page': 1
-                }
-            elif stream_id == 'fulfillments':
-                # Independent v2 fulfillments window, same pattern as shipments
-                params = {
-                    'created_at_start': start_at.strftime('%Y-%m-%d'),
-                    'created_at_end': end_at.strftime('%Y-%m-%d'),
-                    'page': 1
-                }
-            else:
-                LOGGER.info('Skipping unsupported stream %s', stream_id)
-                state = singer.write_bookmark(
-                    state=state,
-                    tap_stream_id=stream_id,
-                    key='created_at',
-                    val=end_at.strftime("%Y-%m-%d %H:%M:%S"))
-                singer.write_state(state)
-                start_at = end_at
-                continue
-
-            try:
-                if stream_id == 'fulfillments':
-                    pages = client.paginate_fulfillments_v2(params)
-                else:
-                    pages = client.paginate(stream_id, params)
-                debug_sample = os.getenv('SHIPSTATION_DEBUG_SAMPLE', 'false').lower() == 'true'
-                bypass_transform = os.getenv('SHIPSTATION_BYPASS_TRANSFORM', 'false').lower() == 'true'
-                first_logged = False
-                first_transformed_logged = False
-                for page in pages:
-                    for record in page:
-                        # For fulfillments, enforce a strict client-side window filter to avoid history dumps
-                        if stream_id == 'fulfillments':
-                            ts_str = record.get('created_at') or record.get('ship_date') or record.get('delivered_at')
-                            try:
-                                ts = pendulum.parse(ts_str) if ts_str else None
-                            except Exception:
-                                ts = None
-                            if (ts is None) or not (start_at <= ts < end_at):
-                                continue
-                        if stream_id in ('shipments', 'fulfillments') and debug_sample and not first_logged:
-                            try:
-                                LOGGER.info('Sample %s record keys (first item): %s', stream_id, sorted(list(record.keys())))
-                            except Exception:
-                                LOGGER.info('Sample %s record available but failed to log keys.', stream_id)
-                            first_logged = True
-
-                        if bypass_transform:
-                            singer.write_record(stream_id, record)
-                        else:
-                            transformed = singer.transform(record, stream_schema.to_dict())
-                            if stream_id in ('shipments', 'fulfillments') and debug_sample and not first_transformed_logged:
-                                try:
-                                    LOGGER.info('Sample transformed %s record keys (first item): %s', stream_id, sorted(list(transformed.keys())))
-                                except Exception:
-                                    LOGGER.info('Transformed sample available but failed to log keys for %s.', stream_id)
-                                first_transformed_logged = True
-                            singer.write_record(stream_id, transformed)
-            except Exception as e:
-                LOGGER.error('Error processing stream %s with params %s: %s', stream_id, params, str(e))
-                continue
+            LOGGER.info("No bookmark found. Syncing last 30 days.")
+            start_at = datetime.now(TIMEZONE) - timedelta(days=30)
+
+    stream_end_at = datetime.now(TIMEZONE)
+    if _TEST_ONE_DAY:
+        test_end = start_at + timedelta(days=1)
+        if test_end < stream_end_at:
+            stream_end_at = test_end
+        LOGGER.info('SHIPSTATION_TEST_ONE_DAY enabled; limiting stream_end_at to %s', stream_end_at)
+
+    if stream_id not in _DATE_FILTER_STREAMS:
+        LOGGER.info('Skipping unsupported stream %s', stream_id)
+        with _OUTPUT_LOCK:
+            singer.write_bookmark(
+                state=state,
+                tap_stream_id=stream_id,
+                key='created_at',
+                val=stream_end_at.strftime(BOOKMARK_FORMAT))
+            singer.write_state(state)
+        return
+
+    windows = []
+    window_start = start_at
+    while window_start < stream_end_at:
+        window_end = min(window_start + timedelta(days=1), stream_end_at)
+        windows.append((window_start, window_end))
+        window_start = window_end
+
+    days_since_state = 0
+    record_count = 0
+    # Once a window fails the bookmark stops advancing, so the next run
+    # re-covers the gap instead of skipping past it.
+    window_failed = False
+    for window_bookmark, params, batches in _fetch_windows(client, stream_id, windows, _CONCURRENCY, _PAGE_SIZE):
+        try:
+            record_count += _write_window(stream_id, schema_dict, batches)
+        except Exception as e:
+            # Stop fetching the rest of the failed window
+            batches.close()
+            LOGGER.error('Error processing stream %s with params %s: %s', stream_id, params, str(e))
+            window_failed = True
+            continue
 
-            state = singer.write_bookmark(
+        if window_failed:
+            continue
+        with _OUTPUT_LOCK:
+            singer.write_bookmark(
                 state=state,
                 tap_stream_id=stream_id,
                 key='created_at',
-                val=end_at.strftime("%Y-%m-%d %H:%M:%S"))
+                val=window_bookmark)
+            # Emit STATE every few days rather than after every day; the final
+            # bookmark is always written once the stream is done.
+            days_since_state += 1
+            if days_since_state >= _STATE_EVERY_DAYS:
+                singer.write_state(state)
+                days_since_state = 0
+
+    with _OUTPUT_LOCK:
+        if days_since_state:
             singer.write_state(state)
-            start_at = end_at
+        sys.stdout.flush()
+    LOGGER.info("Finished syncing stream '%s': %s records.", stream_id, record_count)
+
+
+def sync(config, state, catalog):
+    # Core extraction loop: sync every selected stream at the same time, each
+    # on its own thread, sharing one client so the API rate limit is respected
+    # across all of them.
+    if isinstance(catalog, dict):
+        catalog = Catalog.from_dict(catalog)
+    selected_stream_ids = get_selected_streams(catalog)
+    streams = [stream for stream in catalog.streams if stream.tap_stream_id in selected_stream_ids]
+    if not streams:
+        return
 
-        LOGGER.info("Finished syncing stream '%s'.", stream_id)
+    # One client (and HTTP session) shared by every stream and day-window, with
+    # a keep-alive connection for each request that can be in flight at once:
+    # every stream's concurrent windows, each with its prefetched pages.
+    pool_maxsize = len(streams) * _CONCURRENCY * PREFETCH_PAGES
+    with ShipStationClient(config, pool_maxsize=pool_maxsize) as client:
+        with ThreadPoolExecutor(max_workers=len(streams)) as executor:
+            futures = [executor.submit(sync_stream, client, stream, state) for stream in streams]
+            for future in futures:
+                future.result()
 
 
 @utils.handle_top_exception(LOGGER)
@@ -248,7 +494,7 @@ def main():
     if args.discover:
         discovery = discover()
         catalog_obj = Catalog.from_dict(discovery)
-        print(json.dumps(catalog_obj.to_dict(), indent=2))
+        print(orjson.dumps(catalog_obj.to_dict(), option=orjson.OPT_INDENT_2).decode())
     else:
         catalog = args.catalog or Catalog.from_dict(discover())
         sync(args.config, args.state, catalog)
\ No newline at end of file
@@ -10,158 +10,435 @@ The `ShipStationClient` class encapsulates the logic for:
 Designed to be used as part of a Singer tap for extracting data from ShipStation.
 '''
 
+import os
+import re
 import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urljoin
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 import pendulum
 import singer
-import json
+import orjson
 
 # Singer logger for consistent, structured logs
 LOGGER = singer.get_logger()
 BASE_URL = 'https://api.shipstation.com/v2/'  # V2 API URL
 PAGE_SIZE = 100
+# ShipStation expects Pacific time; build the timezone once, not per call
+_PACIFIC_TZ = pendulum.timezone('America/Los_Angeles')
+_DT_FMT = '%Y-%m-%d %H:%M:%S'
+# Hints of an auth problem in an HTML error page
+_AUTH_ERR_RE = re.compile(rb'error|unauthorized', re.IGNORECASE)
+# Pages of a single listing requested ahead of the one being consumed
+PREFETCH_PAGES = 4
+# (connect, read) timeouts in seconds for every API request
+REQUEST_TIMEOUT = (5, 60)
+# Throttled (429) or failed (5xx) requests for one page are retried up to
+# MAX_RETRIES times in a row, backing off exponentially from BACKOFF_BASE
+# seconds up to BACKOFF_CAP when the server does not say how long to wait
+MAX_RETRIES = 5
+BACKOFF_BASE = 1
+BACKOFF_CAP = 120
+# Requests are paced to RATE_LIMIT requests per RATE_LIMIT_WINDOW seconds
+# (ShipStation's default quota) until a response reports the account's own
+# limit, allowing bursts of up to RATE_LIMIT_BURST requests
+RATE_LIMIT = 200
+RATE_LIMIT_WINDOW = 60
+RATE_LIMIT_BURST = 10
+# Set TAP_SHIPSTATION_CACHE=1 to cache successful GET responses on disk (for
+# development, CI and re-runs after a failed sync); needs the `cache` extra
+HTTP_CACHE_PATH = os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'tap-shipstation', 'http_cache')
+HTTP_CACHE_EXPIRE_AFTER = timedelta(days=7)
 
 def _v2_url(path: str) -> str:
     return BASE_URL.rstrip('/') + '/' + path.lstrip('/')
 
 
+def _safe_int(value):
+    # Non-negative integer header value, or None when missing or malformed
+    return int(value) if value and value.isdigit() else None
+
+
+# Rate-limit headers of one response, as ints (None when absent)
+_RL = namedtuple('RL', 'remaining reset limit')
+
+
+def _parse_rate_limits(headers):
+    # Read the rate-limit headers once per response. response.headers is a
+    # CaseInsensitiveDict, so direct lookups match any casing; the standard
+    # RateLimit-* names are read when the X- ones are absent.
+    return _RL(
+        _safe_int(headers.get('X-Rate-Limit-Remaining') or headers.get('RateLimit-Remaining')),
+        _safe_int(headers.get('X-Rate-Limit-Reset') or headers.get('RateLimit-Reset')),
+        _safe_int(headers.get('X-Rate-Limit-Limit') or headers.get('RateLimit-Limit')))
+
+
+def _next_link(links):
+    # URL of the next page from a response's `links`, given either as a plain
+    # string or as an object with an `href`; None on the last page.
+    next_link = links.get('next') if isinstance(links, dict) else None
+    if isinstance(next_link, dict):
+        next_link = next_link.get('href')
+    return next_link if isinstance(next_link, str) and next_link else None
+
+
+def _retry_after_seconds(value):
+    # Seconds to wait from a Retry-After header, which is either a number of
+    # seconds or an HTTP-date; None when missing or unparseable.
+    if not value:
+        return None
+    seconds = _safe_int(value)
+    if seconds is not None:
+        return seconds
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None or retry_at.tzinfo is None:
+        return None
+    return max(0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    # Client-side rate limiter that spreads requests evenly over the quota
+    # window instead of spending it all at once and stalling until it resets.
+    # Holds up to `capacity` tokens, refilled at `refill_rate` tokens a second;
+    # each request takes one. Safe to share between threads.
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.tokens = capacity
+        self.refill_rate = refill_rate
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # Take a token, sleeping until it has been refilled if none is left.
+        # The token is reserved before sleeping (the count may go negative), so
+        # waiting threads queue up behind each other without holding the lock.
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+            self.last_refill = now
+            self.tokens -= 1
+            wait_seconds = -self.tokens / self.refill_rate if self.tokens < 0 else 0
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    def update(self, capacity, refill_rate):
+        # Re-tune the bucket, e.g. once the API reports the actual quota.
+        with self._lock:
+            self.capacity = capacity
+            self.refill_rate = refill_rate
+            self.tokens = min(self.tokens, capacity)
+
+
+def _new_session():
+    # Plain requests session, or a requests-cache session when
+    # TAP_SHIPSTATION_CACHE=1. The API key headers are kept out of cache keys
+    # and stored responses so the key is never written to the cache file.
+    if os.getenv('TAP_SHIPSTATION_CACHE', '') != '1':
+        return requests.Session()
+    import requests_cache  # optional: pip install tap-shipstation[cache]
+    LOGGER.info('Caching API responses in %s.sqlite', HTTP_CACHE_PATH)
+    os.makedirs(os.path.dirname(HTTP_CACHE_PATH), exist_ok=True)
+    return requests_cache.CachedSession(
+        cache_name=HTTP_CACHE_PATH,
+        backend='sqlite',
+        expire_after=HTTP_CACHE_EXPIRE_AFTER,
+        allowable_methods=('GET',),
+        match_headers=False,
+        ignored_parameters=('api-key', 'SS-API-KEY'))
+
+
 def prepare_datetime(dt):
     # Helper: convert any datetime to the ShipStation-required timezone/format.
     # Note: This function is currently unused by the sync loop but kept for
     # clarity and potential future use (e.g., if ShipStation accepts timestamps).
     # ShipStation requests must be in Pacific timezone
-    timezone = pendulum.timezone('America/Los_Angeles')
-    converted = timezone.convert(dt).strftime('%Y-%m-%d %H:%M:%S')
-    return converted
+    return _PACIFIC_TZ.convert(dt).strftime(_DT_FMT)
 
 
 class ShipStationClient:
     # Thin API client responsible for:
     # - Injecting header-based authentication (v2 API)
     # - Making GET requests with consistent pagination params
-    # - Providing a paginate() generator that yields pages of results
-    def __init__(self, config):
+    # - Providing a paginate() generator that yields records one at a time,
+    #   prefetching the following pages on the client's shared executor
+    __slots__ = ('api_key', 'session', '_get', '_rate_limit_lock', '_resume_at', 'max_page_size', 'max_retries', 'bucket', '_executor')
+
+    def __init__(self, config, pool_maxsize=16):
         # V2 API uses header-based key auth only
         self.api_key = config['api_key']
-
-    def make_request(self, url, params):
-        # Single request helper.
-        # Ensures page_size is set and auth headers are included.
-        LOGGER.info('Making request to %s with query parameters %s', url, params)
-        # ShipStation v2 uses page and page_size (snake_case);
-        # accept pageSize for backwards-compat and normalize it.
-        if 'pageSize' in params and 'page_size' not in params:
-            params['page_size'] = params.pop('pageSize')
-        params.setdefault('page', 1)
-        params.setdefault('page_size', PAGE_SIZE)
-
-        headers = {
+        # One session for the whole sync so keep-alive reuses the TCP+TLS
+        # connection across pages and day-windows; auth headers are set once.
+        self.session = _new_session()
+        self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json',
+            # Ask for compressed JSON bodies; ACCEPT_ENCODING only lists codings
+            # urllib3 can decode here (br/zstd when those packages are installed).
+            'Accept-Encoding': ACCEPT_ENCODING,
             'api-key': self.api_key,
             'SS-API-KEY': self.api_key,
-        }
+        })
+        # Pooled keep-alive connections, with transport-level retries for
+        # connection errors. 429 and 5xx responses are left to paginate(), which
+        # backs off (pausing every thread sharing this client on a 429). pool_maxsize should
+        # cover the requests the caller runs at once, or surplus connections
+        # are opened and thrown away instead of kept alive.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=3, backoff_factor=0.5))
+        self.session.mount('https://', adapter)
+        # Bound once; make_request is called for every page
+        self._get = self.session.get
+        # Rate limiting is shared by every thread using this client: once a
+        # response says the quota is spent, no request is sent before _resume_at.
+        self._rate_limit_lock = threading.Lock()
+        self._resume_at = 0.0
+        # Paces requests within the quota; re-tuned from the rate-limit headers
+        self.bucket = TokenBucket(RATE_LIMIT_BURST, RATE_LIMIT / RATE_LIMIT_WINDOW)
+        # Largest page_size the API has accepted; lowered if a bigger one is rejected
+        self.max_page_size = None
+        # Retries of a throttled or failed page before giving up on it
+        self.max_retries = MAX_RETRIES
+        # Runs the page prefetches of every paginate() call using this client,
+        # one worker per pooled connection; threads are only started on demand.
+        self._executor = ThreadPoolExecutor(max_workers=pool_maxsize, thread_name_prefix='shipstation-prefetch')
+
+    def close(self):
+        # Drop queued prefetches and release the pooled connections held by the session.
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
-        response = requests.get(url, params=params, headers=headers)
+    def make_request(self, url, params):
+        # Single request helper; auth headers come from the session and
+        # paginate() has already normalized page/page_size in params.
+        # params=None requests `url` as-is (e.g. a pagination link from the API).
+        LOGGER.debug('Making request to %s with query parameters %s', url, params)
+        self._wait_for_rate_limit()
+        self.bucket.acquire()
+        response = self._get(url, params=params, timeout=REQUEST_TIMEOUT)
+        self._update_rate_limit(response.headers)
         return response
 
+    def _wait_for_rate_limit(self):
+        # Block until any pause set by a rate-limited response has elapsed.
+        with self._rate_limit_lock:
+            wait_seconds = self._resume_at - time.monotonic()
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    def _pause_requests(self, seconds):
+        # Hold back every request made through this client, on any thread,
+        # for the next `seconds` seconds.
+        with self._rate_limit_lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def _update_rate_limit(self, headers):
+        # Pace requests to the account's quota, and pause all requests until the
+        # window resets once the remaining quota is used up anyway.
+        remaining, reset, limit = _parse_rate_limits(headers)
+        if limit and limit / RATE_LIMIT_WINDOW != self.bucket.refill_rate:
+            self.bucket.update(min(RATE_LIMIT_BURST, limit), limit / RATE_LIMIT_WINDOW)
+        if remaining is not None and remaining < 1 and reset is not None:
+            wait_seconds = reset + 1
+            LOGGER.info("Waiting for %s seconds to respect ShipStation's API rate limit.", wait_seconds)
+            self._pause_requests(wait_seconds)
+
+    def _log_json_error(self, response):
+        # Log what came back when a 200 response body is not valid JSON.
+        # Only the first 1000 bytes are inspected, straight from the raw body, so
+        # a multi-MB HTML error page is never decoded, lowercased or scanned in
+        # full. Nothing is done at all when ERROR logging is disabled.
+        if not LOGGER.isEnabledFor(logging.ERROR):
+            return
+        head = response.content[:1000]
+        LOGGER.error('JSON decode error. Response status: %s', response.status_code)
+        # Passed as-is: CaseInsensitiveDict's repr still copies into a dict, but only
+        # when the message is formatted, which the isEnabledFor(ERROR) check gates
+        LOGGER.error('Response headers: %s', response.headers)
+        LOGGER.error('Response content (first 1000 bytes): %s', head.decode(response.encoding or 'utf-8', errors='replace'))
+        if 'text/html' in response.headers.get('content-type', ''):
+            LOGGER.error('Received HTML response instead of JSON. This usually indicates an API error or authentication issue.')
+            if _AUTH_ERR_RE.search(head):
+                LOGGER.error('API response suggests authentication or authorization error.')
+
     def paginate(self, endpoint, params):
         # Generator that walks through all pages for a given endpoint.
-        # Yields a list of items per page and handles:
+        # Yields records one at a time, in page order, and handles:
         # - JSON parsing edge cases (HTML error pages)
-        # - Basic rate limiting (waits on remaining/reset headers when present)
-        # - Common HTTP errors (401/403/429)
+        # - Rate limiting (make_request waits on remaining/reset headers when present)
+        # - Common HTTP errors (401/403/429/5xx)
+        # - Prefetching the following pages on background threads while a page is consumed
         url = _v2_url(endpoint)
-        while True:
-            response = self.make_request(url, params)
-            headers = response.headers
-            status_code = response.status_code
-            LOGGER.info('ShipStation v2 %s request -> status %s (page=%s, page_size=%s)', endpoint, status_code, params.get('page'), params.get('page_size'))
-
-            if status_code == 200:
-                # CUSTOM FIX: Added try/catch around response.json() to handle HTML error responses
-                # ORIGINAL CODE: response_json = response.json()  # This line crashed when API returned HTML
-                try:
-                    response_json = response.json()
-                except requests.exceptions.JSONDecodeError as e:
-                    # CUSTOM FIX: Log detailed debugging info instead of just crashing
-                    LOGGER.error('JSON decode error. Response status: %s', status_code)
-                    LOGGER.error('Response headers: %s', dict(headers))
-                    LOGGER.error('Response content (first 1000 chars): %s', response.text[:1000])
-                    if 'text/html' in response.headers.get('content-type', ''):
-                        LOGGER.error('Received HTML response instead of JSON. This usually indicates an API error or authentication issue.')
-                        if 'error' in response.text.lower() or 'unauthorized' in response.text.lower():
-                            LOGGER.error('API response suggests authentication or authorization error.')
-                    raise e
-                except json.JSONDecodeError as e:
-                    LOGGER.error('JSON decode error. Response status: %s', status_code)
-                    LOGGER.error('Response headers: %s', dict(headers))
-                    LOGGER.error('Response content (first 1000 chars): %s', response.text[:1000])
-                    if 'text/html' in response.headers.get('content-type', ''):
-                        LOGGER.error('Received HTML response instead of JSON. This usually indicates an API error or authentication issue.')
-                        if 'error' in response.text.lower() or 'unauthorized' in response.text.lower():
-                            LOGGER.error('API response suggests authentication or authorization error.')
-                    raise e
-
-                if response_json.get('total') == 0:
-                    LOGGER.info('No Data for endpoint')
-                    break
-                # Items list can be addressed by endpoint name (e.g., 'shipments')
-                items = response_json.get(endpoint, [])
-                yield items
-                LOGGER.info(
-                    'Finished requesting page %s out of %s total pages.',
-                    response_json.get('page'),
-                    response_json.get('pages'))
-
-                # Determine if more pages are available
-                has_more = False
-                if 'page' in response_json and 'pages' in response_json:
-                    has_more = response_json['page'] < response_json['pages']
-                elif 'links' in response_json:
-                    next_link = response_json['links'].get('next') if isinstance(response_json['links'], dict) else None
-                    has_more = bool(next_link)
+        # Normalize paging params once; page/page_size are tracked as ints below
+        # and only written back into params for the requests that carry them.
+        # ShipStation v2 uses page and page_size (snake_case); pageSize is still
+        # accepted for backwards-compat.
+        if 'pageSize' in params and 'page_size' not in params:
+            params['page_size'] = params.pop('pageSize')
+        page = int(params.get('page', 1))
+        page_size = int(params.get('page_size', PAGE_SIZE))
+        if self.max_page_size is not None and page_size > self.max_page_size:
+            page_size = self.max_page_size
+        params['page'] = page
+        params['page_size'] = page_size
+        # Query parameters for the next request; None once following a `links.next`
+        # URL, which already carries them. `page` still counts pages.
+        query = params
+        # Requests already sent for upcoming pages, as (page, future), in page order
+        pending = deque()
+        # Bound once for the whole listing rather than looked up on every page
+        make_request = self.make_request
+        submit = self._executor.submit
+        loads = orjson.loads
+        # 429/5xx responses in a row for the current page; reset on success
+        attempt = 0
+        try:
+            while True:
+                if pending:
+                    page, future = pending.popleft()
+                    params['page'] = page
+                    response = future.result()
+                    # The future holds the response as its result; let it go so
+                    # the body can be freed once the page is parsed
+                    future = None
+                else:
+                    response = make_request(url, query)
+                headers = response.headers
+                status_code = response.status_code
+                LOGGER.debug('ShipStation v2 %s request -> status %s (page=%s, page_size=%s)', endpoint, status_code, page, page_size)
+
+                if status_code == 200:
+                    attempt = 0
+                    # Parse with orjson straight from the body bytes. HTML error pages
+                    # (and other non-JSON bodies) are logged in detail instead of just crashing;
+                    # orjson.JSONDecodeError is a ValueError.
+                    try:
+                        response_json = loads(response.content)
+                    except ValueError:
+                        self._log_json_error(response)
+                        raise
+                    # The parsed page is all that is needed from here on; drop the
+                    # response so its raw body is freed before the records are consumed.
+                    response = None
+
+                    if response_json.get('total') == 0:
+                        LOGGER.debug('No Data for endpoint')
+                        break
+                    # Items list can be addressed by endpoint name (e.g., 'shipments')
+                    items = response_json.get(endpoint, [])
+
+                    # Determine if more pages are available. Responses with a page count
+                    # are walked by page number, which lets later pages be fetched
+                    # concurrently; cursor-style responses that only give a next link
+                    # are followed link by link. Once a link has been followed
+                    # (query is None) only links can lead to further pages.
+                    has_more = False
+                    next_url = None
+                    if query is not None and 'page' in response_json and 'pages' in response_json:
+                        has_more = response_json['page'] < response_json['pages']
+                    elif 'links' in response_json:
+                        next_link = _next_link(response_json['links'])
+                        has_more = next_link is not None
+                        if has_more:
+                            next_url = urljoin(url, next_link)
+                    elif query is not None:
+                        has_more = len(items) == page_size
+
+                    if has_more:
+                        page += 1
+                        params['page'] = page
+                        if next_url:
+                            url, query = next_url, None
+
+                        # Keep upcoming pages in flight while the caller works through
+                        # this one: up to PREFETCH_PAGES ahead when walking by page
+                        # number with a known page count, otherwise just the next
+                        # page (a link can only be requested once).
+                        if next_url is None and query is not None and 'pages' in response_json:
+                            last_page = min(page + PREFETCH_PAGES - 1, response_json['pages'])
+                        else:
+                            last_page = page
+                        first_page = pending[-1][0] + 1 if pending else page
+                        for ahead in range(first_page, last_page + 1):
+                            page_query = dict(params, page=ahead) if query is not None else None
+                            pending.append((ahead, submit(make_request, url, page_query)))
+
+                    yield from items
+                    LOGGER.debug(
+                        'Finished requesting page %s out of %s total pages.',
+                        response_json.get('page'),
+                        response_json.get('pages'))
+
+                    if not has_more:
+                        break
+                elif status_code == 400 and page == 1 and page_size > PAGE_SIZE:
+                    # A page_size above the documented default was rejected; retry the
+                    # first page with the default and use it for the rest of the sync.
+                    LOGGER.warning('ShipStation rejected page_size=%s; falling back to %s.', page_size, PAGE_SIZE)
+                    self.max_page_size = PAGE_SIZE
+                    page_size = PAGE_SIZE
+                    params['page_size'] = page_size
+                elif status_code == 401:
+                    LOGGER.error('Authentication failed (401). Header-based API key was rejected. Verify the key.')
+                    response.raise_for_status()
+                elif status_code == 403:
+                    LOGGER.error('Forbidden. Please check your API permissions.')
+                    response.raise_for_status()
+                elif (status_code == 429 or status_code >= 500) and attempt < self.max_retries:
+                    # Throttled, or a server-side failure: wait as long as the server
+                    # asks (Retry-After in seconds or as an HTTP-date, else the
+                    # rate-limit reset on a 429), falling back to exponential backoff.
+                    # Waits are capped and jittered so parallel windows and tap runs
+                    # do not all retry at the same instant.
+                    attempt += 1
+                    wait_seconds = _retry_after_seconds(headers.get('Retry-After'))
+                    if wait_seconds is None and status_code == 429:
+                        wait_seconds = _parse_rate_limits(headers).reset
+                    if wait_seconds is None:
+                        wait_seconds = BACKOFF_BASE * 2 ** attempt
+                    wait_seconds = min(max(wait_seconds, 1), BACKOFF_CAP)
+                    wait_seconds += random.uniform(0, 0.5 * wait_seconds)
+                    LOGGER.info('Request failed with status %s; waiting %.1f seconds before retrying page %s (attempt %s of %s).',
+                                status_code, wait_seconds, page, attempt, self.max_retries)
+                    if status_code == 429:
+                        # The quota is shared, so hold back every thread using this client
+                        self._pause_requests(wait_seconds)
+                    else:
+                        time.sleep(wait_seconds)
+                    # Requests sent ahead were likely throttled or failed too; drop them
+                    # and re-request from this page once the wait is over.
+                    for _, future in pending:
+                        future.cancel()
+                    pending.clear()
+                    continue
                 else:
-                    has_more = len(items) == params.get('page_size', PAGE_SIZE)
-
-                if not has_more:
-                    break
-
-                params['page'] = int(params.get('page', 1)) + 1
-
-                remaining = None
-                reset = None
-                for k, v in headers.items():
-                    lk = k.lower()
-                    if 'rate-limit-remaining' in lk:
-                        try:
-                            remaining = int(v)
-                        except Exception:
-                            remaining = None
-                    if 'rate-limit-reset' in lk:
-                        try:
-                            reset = int(v)
-                        except Exception:
-                            reset = None
-                if remaining is not None and remaining < 1 and reset is not None:
-                    wait_seconds = reset + 1
-                    LOGGER.info("Waiting for %s seconds to respect ShipStation's API rate limit.", wait_seconds)
-                    time.sleep(wait_seconds)
-            elif status_code == 401:
-                LOGGER.error('Authentication failed (401). Header-based API key was rejected. Verify the key.')
-                response.raise_for_status()
-            elif status_code == 403:
-                LOGGER.error('Forbidden. Please check your API permissions.')
-                response.raise_for_status()
-            elif status_code == 429:
-                time.sleep(60)
-                LOGGER.info("Waiting for 60 seconds due to 429 without warning")
-            else:
-                LOGGER.error('Request failed with status %s', status_code)
-                LOGGER.error('Response content: %s', response.text[:1000])
-                response.raise_for_status()
-
-    def paginate_fulfillments_v2(self, params):
-        # Thin wrapper for clarity; reuse generic v2 paginator
-        for items in self.paginate('fulfillments', params):
-            yield items
\ No newline at end of file
+                    LOGGER.error('Request failed with status %s', status_code)
+                    LOGGER.error('Response content: %s', response.text[:1000])
+                    response.raise_for_status()
+        finally:
+            # Whether the listing is exhausted, the caller stopped early or an
+            # error (401/403/5xx) is being raised, drop this listing's queued
+            # prefetches and return without waiting on requests still in flight.
+            for _, future in pending:
+                future.cancel()
@@ -0,0 +1,219 @@
+import gc
+import time
+import unittest
+from email.utils import formatdate
+import weakref
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import orjson
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from tap_shipstation.client import ShipStationClient, TokenBucket
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {'content-type': 'application/json'})
+        self.content = orjson.dumps(body)
+        self.text = self.content.decode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError('%s error' % self.status_code, response=self)
+
+
+class FakeTransport:
+    # Stands in for session.get: serves `records` ids in pages of the requested
+    # page_size (`page_size` when following links), shaping each body with
+    # `shape(page, pages, items)`. Pages are picked from a `cursor` in the URL
+    # when present, otherwise from the `page` param.
+    def __init__(self, records, page_size, shape):
+        self.records = records
+        self.page_size = page_size
+        self.shape = shape
+        self.calls = []
+        # Weak references to the responses served, by page
+        self.responses = {}
+
+    def __call__(self, url, params=None, timeout=None):
+        self.calls.append((url, dict(params) if params is not None else None))
+        query = parse_qs(urlparse(url).query)
+        if 'cursor' in query:
+            page = int(query['cursor'][0])
+        else:
+            page = int((params or {}).get('page', 1))
+        page_size = int((params or {}).get('page_size', self.page_size))
+        pages = -(-self.records // page_size)
+        first = (page - 1) * page_size
+        items = [{'id': i} for i in range(first, min(first + page_size, self.records))]
+        response = FakeResponse(self.shape(page, pages, items))
+        self.responses[page] = weakref.ref(response)
+        return response
+
+
+class ScriptedTransport:
+    # Wraps a FakeTransport, answering the requests it is asked for with the
+    # scripted (status_code, headers) error responses first, in order.
+    # `when(url, params)` picks which requests get them (default: any).
+    def __init__(self, transport, errors, when=None):
+        self.transport = transport
+        self.errors = list(errors)
+        self.when = when or (lambda url, params: True)
+        self.calls = transport.calls
+
+    def __call__(self, url, params=None, timeout=None):
+        if self.errors and self.when(url, params):
+            self.calls.append((url, dict(params) if params is not None else None))
+            status_code, headers = self.errors.pop(0)
+            return FakeResponse({}, status_code, headers)
+        return self.transport(url, params, timeout)
+
+
+def _page_shape(page, pages, items):
+    return {'shipments': items, 'page': page, 'pages': pages}
+
+
+def _cursor_link(page, pages):
+    if page >= pages:
+        return None
+    return 'https://api.shipstation.com/v2/shipments?cursor=%d' % (page + 1)
+
+
+class ClientTestCase(unittest.TestCase):
+    def client(self, transport):
+        client = ShipStationClient({'api_key': 'test'})
+        self.addCleanup(client.close)
+        # No pacing; the fake transport is not rate limited
+        client.bucket = TokenBucket(1000, 1000)
+        client._get = transport
+        return client
+
+
+class PaginateTest(ClientTestCase):
+    def paginate(self, shape, records=6, page_size=2):
+        transport = FakeTransport(records, page_size, shape)
+        client = self.client(transport)
+        ids = [record['id'] for record in client.paginate('shipments', {'page_size': page_size})]
+        return ids, transport.calls
+
+    def test_page_numbers(self):
+        ids, calls = self.paginate(
+            lambda page, pages, items: {'shipments': items, 'page': page, 'pages': pages})
+        self.assertEqual(ids, list(range(6)))
+        self.assertEqual(sorted(params['page'] for _, params in calls), [1, 2, 3])
+
+    def test_next_link_href(self):
+        ids, calls = self.paginate(
+            lambda page, pages, items: {'shipments': items,
+                                        'links': {'next': {'href': _cursor_link(page, pages)}}})
+        self.assertEqual(ids, list(range(6)))
+        self.assertEqual(len(calls), 3)
+
+    def test_next_link_string(self):
+        ids, calls = self.paginate(
+            lambda page, pages, items: {'shipments': items, 'links': {'next': _cursor_link(page, pages)}})
+        self.assertEqual(ids, list(range(6)))
+        self.assertEqual(len(calls), 3)
+
+    def test_next_link_with_page_count(self):
+        # `pages` without `page`: the link is followed, and requested only once
+        ids, calls = self.paginate(
+            lambda page, pages, items: {'shipments': items, 'pages': pages,
+                                        'links': {'next': {'href': _cursor_link(page, pages)}}},
+            records=10)
+        self.assertEqual(ids, list(range(10)))
+        self.assertEqual(len(calls), 5)
+
+    def test_rejected_page_size_falls_back(self):
+        # Page sizes above 100 are rejected with a 400
+        transport = ScriptedTransport(
+            FakeTransport(250, 100, _page_shape), [(400, {})] * 5,
+            when=lambda url, params: int(params['page_size']) > 100)
+        client = self.client(transport)
+        ids = [record['id'] for record in client.paginate('shipments', {'page_size': 500})]
+        self.assertEqual(ids, list(range(250)))
+        requested = [(params['page'], params['page_size']) for _, params in transport.calls]
+        # The first page is retried at 100, and the prefetched pages use it too
+        self.assertEqual(requested[:2], [(1, 500), (1, 100)])
+        self.assertEqual(sorted(requested[2:]), [(2, 100), (3, 100)])
+        self.assertEqual(client.max_page_size, 100)
+
+    def test_responses_freed_before_records_consumed(self):
+        transport = FakeTransport(6, 2, _page_shape)
+        client = self.client(transport)
+        for record in client.paginate('shipments', {'page_size': 2}):
+            page = record['id'] // 2 + 1
+            # CPython frees an unreferenced response at once; collect so the
+            # check only fails while something still holds a strong reference
+            gc.collect()
+            self.assertIsNone(transport.responses[page](), 'page %s response still alive' % page)
+
+
+
+@mock.patch('tap_shipstation.client.random.uniform', lambda a, b: 0)
+@mock.patch('time.sleep')
+@mock.patch.object(ShipStationClient, '_pause_requests')
+class RetryTest(ClientTestCase):
+    def test_429_waits_for_ratelimit_reset(self, pause, sleep):
+        # Only the standard RateLimit-* headers, no Retry-After
+        transport = ScriptedTransport(FakeTransport(6, 2, _page_shape), [(429, {'RateLimit-Reset': '7'})])
+        client = self.client(transport)
+        ids = [record['id'] for record in client.paginate('shipments', {'page_size': 2})]
+        self.assertEqual(ids, list(range(6)))
+        pause.assert_called_once_with(7)
+
+    def test_429_honours_retry_after_seconds(self, pause, sleep):
+        # Page 2 is prefetched; once throttled it is requested again
+        transport = ScriptedTransport(
+            FakeTransport(6, 2, _page_shape), [(429, {'Retry-After': '3'})],
+            when=lambda url, params: params is not None and params['page'] == 2)
+        client = self.client(transport)
+        ids = [record['id'] for record in client.paginate('shipments', {'page_size': 2})]
+        self.assertEqual(ids, list(range(6)))
+        self.assertEqual([params['page'] for _, params in transport.calls].count(2), 2)
+        # A 429 holds back every thread sharing the client, not just this one
+        pause.assert_called_once_with(3)
+        sleep.assert_not_called()
+
+    def test_429_honours_retry_after_http_date(self, pause, sleep):
+        retry_after = formatdate(time.time() + 30, usegmt=True)
+        transport = ScriptedTransport(FakeTransport(6, 2, _page_shape), [(429, {'Retry-After': retry_after})])
+        client = self.client(transport)
+        ids = [record['id'] for record in client.paginate('shipments', {'page_size': 2})]
+        self.assertEqual(ids, list(range(6)))
+        self.assertAlmostEqual(pause.call_args[0][0], 30, delta=2)
+
+    def test_5xx_backs_off_on_calling_thread_only(self, pause, sleep):
+        transport = ScriptedTransport(FakeTransport(6, 2, _page_shape), [(503, {}), (502, {})])
+        client = self.client(transport)
+        ids = [record['id'] for record in client.paginate('shipments', {'page_size': 2})]
+        self.assertEqual(ids, list(range(6)))
+        # No Retry-After: exponential backoff, and no pause for other threads
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [2, 4])
+        pause.assert_not_called()
+
+    def test_gives_up_after_max_retries(self, pause, sleep):
+        transport = ScriptedTransport(FakeTransport(6, 2, _page_shape), [(503, {})] * 5)
+        client = self.client(transport)
+        client.max_retries = 2
+        with self.assertRaises(requests.HTTPError):
+            list(client.paginate('shipments', {'page_size': 2}))
+        self.assertEqual([params['page'] for _, params in transport.calls], [1, 1, 1])
+
+    def test_429_rerequests_same_link(self, pause, sleep):
+        def shape(page, pages, items):
+            return {'shipments': items, 'links': {'next': _cursor_link(page, pages)}}
+        transport = ScriptedTransport(
+            FakeTransport(6, 2, shape), [(429, {'Retry-After': '1'})],
+            when=lambda url, params: 'cursor=2' in url)
+        client = self.client(transport)
+        ids = [record['id'] for record in client.paginate('shipments', {'page_size': 2})]
+        self.assertEqual(ids, list(range(6)))
+        self.assertEqual([url.endswith('cursor=2') for url, _ in transport.calls].count(True), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import io
+import os
+import queue
+import threading
+import time
+import unittest
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest import mock
+
+import orjson
+from singer.catalog import Catalog
+
+import tap_shipstation
+from tap_shipstation import BOOKMARK_FORMAT, TIMEZONE, WINDOW_BUFFER_BATCHES
+
+
+class FakeClient:
+    # Stands in for ShipStationClient.paginate: serves `records` records per
+    # day-window, keyed by the window's created_at_start. Windows can be slowed
+    # down per record (`delays`) or fail at a given record (`fail`).
+    def __init__(self, records=5, delays=None, fail=None):
+        self.records = records
+        self.delays = delays or {}
+        self.fail = fail or {}
+        self.lock = threading.Lock()
+        # Records handed out, and windows whose paginate() has been closed
+        self.produced = defaultdict(int)
+        self.closed = set()
+
+    def paginate(self, stream_id, params):
+        day = params['created_at_start']
+        try:
+            for i in range(self.records):
+                time.sleep(self.delays.get(day, 0))
+                if self.fail.get(day) == i:
+                    raise RuntimeError('fetch failed for %s' % day)
+                with self.lock:
+                    self.produced[day] += 1
+                yield {'shipment_id': '%s-%d' % (day, i)}
+        finally:
+            with self.lock:
+                self.closed.add(day)
+
+
+def _windows(count, start=datetime(2026, 1, 1, tzinfo=TIMEZONE)):
+    return [(start + timedelta(days=d), start + timedelta(days=d + 1)) for d in range(count)]
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _wait_until_stalled(client):
+    # Wait until the fetch threads stop producing, e.g. on full buffers
+    last = None
+    while last != dict(client.produced):
+        last = dict(client.produced)
+        time.sleep(0.1)
+
+
+def _close_in_thread(generator):
+    # Close a generator on another thread, so a hang fails the test instead of stalling it
+    closer = threading.Thread(target=generator.close)
+    closer.start()
+    closer.join(timeout=5)
+    return not closer.is_alive()
+
+
+class RecordingQueue(queue.Queue):
+    # Bounded queue that remembers the most items it ever held
+    instances = []
+
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize)
+        self.max_seen = 0
+        RecordingQueue.instances.append(self)
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        with self.mutex:
+            self.max_seen = max(self.max_seen, self._qsize())
+
+
+class FetchWindowsTest(unittest.TestCase):
+    def test_windows_come_out_oldest_first(self):
+        # The oldest window is the slowest, so later ones finish first
+        client = FakeClient(delays={'2026-01-01': 0.02, '2026-01-02': 0.01})
+        ids = []
+        for _, _, batches in tap_shipstation._fetch_windows(client, 'shipments', _windows(4), 4, 2):
+            for batch in batches:
+                ids.extend(record['shipment_id'] for record in batch)
+        expected = ['2026-01-0%d-%d' % (day, i) for day in range(1, 5) for i in range(5)]
+        self.assertEqual(ids, expected)
+
+    def test_fetch_error_is_reraised_from_its_window(self):
+        client = FakeClient(fail={'2026-01-02': 3})
+        outcomes = []
+        for _, _, batches in tap_shipstation._fetch_windows(client, 'shipments', _windows(3), 3, 2):
+            try:
+                outcomes.append(sum(len(batch) for batch in batches))
+            except RuntimeError as e:
+                outcomes.append(str(e))
+        self.assertEqual(outcomes, [5, 'fetch failed for 2026-01-02', 5])
+
+    def test_closing_a_window_releases_its_fetch_thread(self):
+        client = FakeClient(records=1000)
+        windows = tap_shipstation._fetch_windows(client, 'shipments', _windows(2), 2, 1)
+        _, _, batches = next(windows)
+        next(batches)
+        _wait_until_stalled(client)
+        batches.close()
+        self.assertTrue(_wait_for(lambda: '2026-01-01' in client.closed))
+        self.assertTrue(_close_in_thread(windows))
+        self.assertEqual(client.closed, {'2026-01-01', '2026-01-02'})
+
+    def test_stopping_early_releases_fetch_threads(self):
+        client = FakeClient(records=1000)
+        threads_before = threading.active_count()
+        windows = tap_shipstation._fetch_windows(client, 'shipments', _windows(5), 3, 1)
+        next(windows)
+        _wait_until_stalled(client)
+        self.assertTrue(_close_in_thread(windows))
+        self.assertEqual(client.closed, {'2026-01-01', '2026-01-02', '2026-01-03'})
+        self.assertEqual(threading.active_count(), threads_before)
+
+    def test_window_buffers_are_bounded(self):
+        RecordingQueue.instances = []
+        client = FakeClient(records=50)
+        with mock.patch.object(tap_shipstation.queue, 'Queue', RecordingQueue):
+            windows = tap_shipstation._fetch_windows(client, 'shipments', _windows(3), 3, 2)
+            _, _, first_batches = next(windows)
+            _wait_until_stalled(client)
+            # Each fetch thread holds at most one more batch while waiting on its buffer
+            for day in ('2026-01-01', '2026-01-02', '2026-01-03'):
+                self.assertLessEqual(client.produced[day], (WINDOW_BUFFER_BATCHES + 1) * 2)
+            for _ in first_batches:
+                pass
+            for _, _, batches in windows:
+                for _ in batches:
+                    pass
+        self.assertEqual(len(RecordingQueue.instances), 3)
+        for buffer in RecordingQueue.instances:
+            self.assertLessEqual(buffer.max_seen, WINDOW_BUFFER_BATCHES)
+
+
+class SyncStreamTest(unittest.TestCase):
+    def test_failed_window_freezes_bookmark(self):
+        stream = Catalog.from_dict(tap_shipstation.discover()).get_stream('shipments')
+        start_at = (datetime.now(TIMEZONE) - timedelta(days=3)).replace(microsecond=0)
+        second_day = (start_at + timedelta(days=1)).strftime('%Y-%m-%d')
+        client = FakeClient(fail={second_day: 2})
+        state = {'bookmarks': {'shipments': {'created_at': start_at.strftime(BOOKMARK_FORMAT)}}}
+
+        out = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        with mock.patch('sys.stdout', out):
+            tap_shipstation.sync_stream(client, stream, state)
+        out.flush()
+        messages = [orjson.loads(line) for line in out.buffer.getvalue().splitlines()]
+
+        # Windows after the failed one are still written, but the bookmark
+        # stays at the end of the last window before it
+        records = [m for m in messages if m['type'] == 'RECORD']
+        self.assertGreater(len(records), 5)
+        last_state = [m for m in messages if m['type'] == 'STATE'][-1]
+        self.assertEqual(
+            last_state['value']['bookmarks']['shipments']['created_at'],
+            (start_at + timedelta(days=1)).strftime(BOOKMARK_FORMAT))
+
+
+
+class EnvIntTest(unittest.TestCase):
+    def test_unset_uses_default(self):
+        self.assertNotIn('SHIPSTATION_TEST_SETTING', os.environ)
+        self.assertEqual(tap_shipstation._env_int('SHIPSTATION_TEST_SETTING', 8), 8)
+
+    def test_malformed_and_out_of_range_values(self):
+        for value, expected in {'': 8, 'x': 8, '0': 1, '-3': 1, '12': 12}.items():
+            with mock.patch.dict(os.environ, {'SHIPSTATION_TEST_SETTING': value}):
+                self.assertEqual(tap_shipstation._env_int('SHIPSTATION_TEST_SETTING', 8), expected, value)
+
+
+if __name__ == '__main__':
+    unittest.main()